@@ -1,11 +1,13 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2025 Jeff Culverhouse
+from aiohttp import ClientError
 import argparse
 import asyncio
 from blinkpy.blinkpy import Blink
 import concurrent.futures
-from datetime import datetime
+from datetime import date, datetime
 import logging
+import os
 from json_logging import get_logger
 from mqtt_helper import MqttHelper
 from paho.mqtt.client import Client
@@ -17,11 +19,25 @@ from blink2mqtt.interface import BlinkServiceProtocol as Blink2Mqtt
 
 
 class Base:
+    # whether anything after Base in the MRO supplies a sync __enter__/__exit__, resolved once per subclass
+    _super_has_enter = False
+    _super_has_exit = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        mro = cls.__mro__
+        after_base = mro[mro.index(Base) + 1 :]
+        cls._super_has_enter = any("__enter__" in c.__dict__ for c in after_base)
+        cls._super_has_exit = any("__exit__" in c.__dict__ for c in after_base)
+
     def __init__(self: Blink2Mqtt, args: argparse.Namespace | None = None, **kwargs: Any) -> None:
         super().__init__(**kwargs)
 
         self.loop = asyncio.get_running_loop()
-        self.loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=16))
+
+        # separate pools so slow Blink downloads can't hold up MQTT publishes
+        self.blink_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="blink-io")
+        self.mqtt_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="mqtt")
 
         self.args = args
         self.logger = get_logger(__name__)
@@ -43,27 +59,39 @@ class Base:
         self.service = self.mqtt_config["prefix"]
         self.service_name = f"{self.service} service"
         self.qos = self.mqtt_config["qos"]
+        self.compact_discovery = self.mqtt_config.get("compact_discovery", False)
 
         self.mqtt_helper = MqttHelper(self.service, default_qos=self.qos, default_retain=True)
 
         self.running = False
+        self.tasks: list[asyncio.Task[None]] = []
         self.discovery_complete = False
 
         self.blink_cameras: dict[str, dict[str, Any]] = {}
         self.blink_sync_modules: dict[str, dict[str, Any]] = {}
+        self.sync_module_slugs: dict[str, str] = {}
         self.devices: dict[str, Any] = {}
+        self.component_signatures: dict[str, tuple[Any, ...]] = {}
+        self.discovery_payloads: dict[str, bytes] = {}
+        self.device_names: dict[str, str] = {}
+        self.state_topics: dict[tuple[str, ...], str] = {}
         self.states: dict[str, Any] = {}
         self.dirty: dict[str, set[tuple[str, str]]] = {}
-        self.events: list[str] = []
+        self.events: list[dict[str, Any]] = []
+        self.events_ready = asyncio.Event()
+        self.publish_buffer: list[tuple[str, Any]] = []
+        self.publish_pending = asyncio.Event()
 
         self.mqttc: Client
         self.mqtt_connect_time: datetime
         self.client_id = self.mqtt_helper.client_id()
 
         self.session: Any = None
+        self.cred_path = os.path.join(self.config["config_path"], "blink.cred")
+        self.key_path = os.path.join(self.config["config_path"], "key.txt")
         self.blink: Blink
         self.api_calls = 0
-        self.last_call_date = ""
+        self.last_call_date = date.today()
         self.rate_limited = False
 
         self.device_interval = self.blink_config["device_interval"]
@@ -72,9 +100,8 @@ class Base:
         self.snapshot_interval_battery_hours = self.blink_config["snapshot_interval_battery_hours"]
 
     async def __aenter__(self: Self) -> Blink2Mqtt:
-        super_enter = getattr(super(), "__enter__", None)
-        if callable(super_enter):
-            super_enter()
+        if self._super_has_enter:
+            cast(Any, super()).__enter__()
 
         await cast(Any, self).mqttc_create()
         self.running = True
@@ -82,35 +109,41 @@ class Base:
         return cast(Blink2Mqtt, self)
 
     async def __aexit__(self: Self, exc_type: BaseException | None, exc_val: BaseException | None, exc_tb: TracebackType) -> None:
-        super_exit = getattr(super(), "__exit__", None)
-        if callable(super_exit):
-            super_exit(exc_type, exc_val, exc_tb)
+        if self._super_has_exit:
+            cast(Any, super()).__exit__(exc_type, exc_val, exc_tb)
 
         self.running = False
 
-        if self.session and not self.session.closed:
-            try:
-                loop = asyncio.get_running_loop()
-            except RuntimeError:
-                loop = None
+        await cast(Any, self).close_session()
+        await cast(Any, self).close_mqtt()
 
-            if loop and loop.is_running():
-                loop.create_task(self.session.close())
-            else:
-                asyncio.run(self.session.close())
+        self.blink_executor.shutdown(wait=False, cancel_futures=True)
+        self.mqtt_executor.shutdown(wait=False, cancel_futures=True)
 
-        if cast(Any, self).mqttc is not None:
+        self.logger.info("exiting gracefully")
+
+    async def close_session(self: Blink2Mqtt) -> None:
+        if not self.session or self.session.closed:
+            return
+        try:
+            await self.session.close()
+        except (ClientError, OSError) as e:
+            self.logger.warning(f"error closing Blink session: {e}")
+
+    async def close_mqtt(self: Blink2Mqtt) -> None:
+        if cast(Any, self).mqttc is None:
+            return
+        try:
+            await self.publish_service_availability("offline")
+            # the flush loop has already been cancelled, so send whatever it left queued, offline last
+            await self.flush_publish_buffer()
+            self.mqttc.loop_stop()
+        except Exception as e:
+            self.logger.debug(f"mqtt loop_stop failed: {e}")
+
+        if self.mqttc.is_connected():
             try:
-                await cast(Any, self).publish_service_availability("offline")
-                cast(Any, self).mqttc.loop_stop()
+                self.mqttc.disconnect()
+                self.logger.info("disconnected from MQTT broker")
             except Exception as e:
-                self.logger.debug(f"mqtt loop_stop failed: {e}")
-
-            if cast(Any, self).mqttc.is_connected():
-                try:
-                    cast(Any, self).mqttc.disconnect()
-                    self.logger.info("disconnected from MQTT broker")
-                except Exception as e:
-                    self.logger.warning(f"error during MQTT disconnect: {e}")
-
-        self.logger.info("exiting gracefully")
+                self.logger.warning(f"error during MQTT disconnect: {e}")
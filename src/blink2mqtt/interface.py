@@ -1,8 +1,8 @@
 from argparse import Namespace
-from asyncio import AbstractEventLoop
+from asyncio import AbstractEventLoop, Event, Task
 from blinkpy.blinkpy import Blink
 import concurrent.futures
-from datetime import datetime
+from datetime import date, datetime
 from logging import Logger
 from mqtt_helper import MqttHelper
 from paho.mqtt.client import Client, MQTTMessage, ConnectFlags, DisconnectFlags
@@ -21,20 +21,31 @@ class BlinkServiceProtocol(Protocol):
     blink_config: dict[str, Any]
     blink_sync_modules: dict[str, dict[str, Any]]
     blink: Blink
+    blink_executor: concurrent.futures.ThreadPoolExecutor
     client_id: str
+    component_signatures: dict[str, tuple[Any, ...]]
+    compact_discovery: bool
     config: dict[str, Any]
+    cred_path: str
     device_interval: int
     device_list_interval: int
+    device_names: dict[str, str]
     devices: dict[str, Any]
     discovery_complete: bool
-    events: list
-    last_call_date: str
+    discovery_payloads: dict[str, bytes]
+    events: list[dict[str, Any]]
+    events_ready: Event
+    key_path: str
+    last_call_date: date
     logger: Logger
     loop: AbstractEventLoop
     mqtt_config: dict[str, Any]
     mqtt_connect_time: datetime
+    mqtt_executor: concurrent.futures.ThreadPoolExecutor
     mqtt_helper: MqttHelper
     mqttc: Client
+    publish_buffer: list[tuple[str, Any]]
+    publish_pending: Event
     qos: int
     rate_limited: bool
     running: bool
@@ -44,17 +55,22 @@ class BlinkServiceProtocol(Protocol):
     snapshot_interval_wired_minutes: int
     snapshot_interval_battery_hours: int
     dirty: dict[str, set[tuple[str, str]]]
+    state_topics: dict[tuple[str, ...], str]
+    sync_module_slugs: dict[str, str]
     states: dict[str, Any]
+    tasks: list[Task[None]]
 
     async def blink_refresh(self) -> None: ...
-    async def build_camera_states(self, device_id: str, camera: dict[str, str]) -> None: ...
-    async def build_camera(self, camera: dict[str, str]) -> str: ...
-    async def build_component(self, device: dict[str, str]) -> str: ...
-    async def build_switch(self, sync_module: dict[str, str]) -> str: ...
-    async def build_sync_module_states(self, device_id: str, sync_module: dict[str, str]) -> None: ...
+    async def build_camera_states(self, device_id: str, camera: dict[str, Any]) -> None: ...
+    async def build_camera(self, camera: dict[str, Any]) -> str: ...
+    async def build_component(self, device: dict[str, Any]) -> str: ...
+    async def build_switch(self, sync_module: dict[str, Any]) -> str: ...
+    async def build_sync_module_states(self, device_id: str, sync_module: dict[str, Any]) -> None: ...
     async def collect_all_blink_events(self) -> None: ...
     async def cleanup_old_snapshots(self) -> None: ...
     async def cleanup_snapshots_loop(self) -> None: ...
+    async def close_mqtt(self) -> None: ...
+    async def close_session(self) -> None: ...
     async def collect_events_loop(self) -> None: ...
     async def collect_snapshots_loop(self) -> None: ...
     async def connect(self) -> None: ...
@@ -86,12 +102,15 @@ class BlinkServiceProtocol(Protocol):
     async def mqttc_create(self) -> None: ...
     async def process_events_loop(self) -> None: ...
     async def process_events(self) -> None: ...
+    async def publish_flush_loop(self) -> None: ...
+    async def flush_publish_buffer(self) -> bool: ...
     async def store_snapshot_in_media(self, device_id: str, image_b64: str) -> str | None: ...
     async def publish_vision_request(self, device_id: str, image_b64: str, source: str) -> None: ...
     async def _capture_and_publish_vision(self, device_id: str) -> None: ...
     async def publish_device_availability(self, device_id: str, online: bool = True) -> None: ...
     async def publish_device_discovery(self, device_id: str) -> None: ...
     async def publish_device_image(self, device_id: str, type: str) -> None: ...
+    async def publish_built_device(self, device_id: str, kind: str, source: dict[str, Any]) -> str: ...
     async def publish_device_state(self, device_id: str, subject: str = "", sub: str = "", publish_all: bool = False) -> None: ...
     async def publish_service_availability(self, status: str = "online") -> None: ...
     async def publish_service_discovery(self) -> None: ...
@@ -102,6 +121,7 @@ class BlinkServiceProtocol(Protocol):
     async def refresh_device_list(self) -> None: ...
     async def refresh_snapshot_all_devices(self) -> None: ...
     async def refresh_snapshot_devices(self, device_ids: list[str], update_last_snapshot: bool = True) -> None: ...
+    async def refresh_sync_module_info(self, sync_module: Any) -> None: ...
     async def refresh_snapshot(self, device_id: str, type: str) -> None: ...
     async def set_arm_mode(self, device_id: str, switch: bool) -> Any | None: ...
     async def set_motion_detection(self, device_id: str, switch: bool) -> bool | None: ...
@@ -109,27 +129,33 @@ class BlinkServiceProtocol(Protocol):
     async def take_snapshot_from_device(self, device_id: str) -> None: ...
 
     def _assert_no_tuples(self, data: Any, path: str = "root") -> None: ...
+    def _publish_batch(self, batch: list[tuple[str, Any]]) -> bool: ...
     def _wrap_async(
         self,
         coro_func: Callable[..., Coroutine[Any, Any, _T]],
     ) -> Callable[..., None]: ...
 
-    def classify_device(self, device: dict[str, str]) -> str | None: ...
+    def build_camera_components(self, device_id: str, camera: dict[str, Any]) -> dict[str, dict[str, Any]]: ...
+    def classify_device(self, device: dict[str, Any]) -> str | None: ...
+    def component_changed(self, device_id: str, signature: tuple[Any, ...]) -> bool: ...
+    def drain_events(self) -> list[dict[str, Any]]: ...
     def get_platform(self, device_id: str) -> str: ...
     def get_component(self, device_id: str) -> dict[str, Any]: ...
     def get_device_availability_topic(self, device_id: str) -> str: ...
     def get_device_image_topic(self, device_id: str) -> str: ...
     def get_device_name(self, device_id: str) -> str: ...
     def get_device_name_slug(self, device_id: str) -> str: ...
+    def get_state_topic(self, device_id: str, *parts: str) -> str: ...
     def get_device_state_topic(self, device_id: str, mode_name: str = "") -> str: ...
-    def get_next_event(self) -> dict[str, Any] | None: ...
     def handle_signal(self, signum: int, frame: FrameType | None) -> Any: ...
     def heartbeat_ready(self) -> None: ...
     def increase_api_calls(self) -> None: ...
+    def index_sync_modules(self) -> None: ...
     def is_discovered(self, device_id: str) -> bool: ...
     def load_config(self, config_arg: Any | None = None) -> dict[str, Any]: ...
     def log_future_result(self, fut: concurrent.futures.Future) -> None: ...
     def mark_ready(self) -> None: ...
+    def queue_publish(self, topic: str, payload: Any) -> None: ...
     def read_file(self, file_name: str) -> str: ...
     def _read_version_file(self) -> str: ...
     def reset_api_call_count(self) -> None: ...
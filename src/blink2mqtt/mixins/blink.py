@@ -3,11 +3,51 @@
 from __future__ import annotations
 
 import asyncio
+from itertools import chain
 from typing import TYPE_CHECKING, Any, cast
 
 if TYPE_CHECKING:
     from blink2mqtt.interface import BlinkServiceProtocol as Blink2Mqtt
 
+# device builds allowed to run at once during refresh_device_list
+MAX_CONCURRENT_BUILDS = 6
+
+# camera components: (key, platform, name, topic parts, has a command topic, extra fields)
+_CAMERA_COMPONENTS: tuple[tuple[str, str, str, tuple[str, ...], bool, dict[str, Any]], ...] = (
+    ("snapshot", "camera", "Snapshot", ("snapshot",), False, {"image_encoding": "b64", "icon": "mdi:camera"}),
+    ("eventshot", "camera", "Event Snapshot", ("eventshot",), False, {"image_encoding": "b64", "icon": "mdi:camera"}),
+    ("motion", "binary_sensor", "Motion", ("binary_sensor", "motion"), False, {"pl_on": True, "pl_off": False, "icon": "mdi:motion-sensor"}),
+    ("motion_detection", "switch", "Motion Detection", ("switch", "motion_detection"), True, {"pl_on": "ON", "pl_off": "OFF", "icon": "mdi:motion-sensor"}),
+    (
+        "save_snapshots",
+        "switch",
+        "Save Snapshots",
+        ("switch", "save_snapshots"),
+        True,
+        {"pl_on": "ON", "pl_off": "OFF", "icon": "mdi:content-save", "entity_category": "config"},
+    ),
+    ("nightvision", "select", "Night Vision", ("select", "nightvision"), True, {"icon": "mdi:light-flood-down"}),
+    (
+        "temperature",
+        "sensor",
+        "Temperature",
+        ("sensor", "temperature"),
+        False,
+        {"device_class": "temperature", "state_class": "measurement", "unit_of_measurement": "°F", "icon": "mdi:thermometer", "entity_category": "diagnostic"},
+    ),
+    ("battery_status", "sensor", "Battery Status", ("sensor", "battery_status"), False, {"entity_category": "diagnostic", "icon": "mdi:battery-alert"}),
+    (
+        "wifi_signal",
+        "sensor",
+        "Wifi Signal",
+        ("sensor", "wifi_signal"),
+        False,
+        {"device_class": "signal_strength", "unit_of_measurement": "dBm", "icon": "mdi:wifi", "entity_category": "diagnostic"},
+    ),
+    ("last_event", "sensor", "Last Event", ("sensor", "last_event"), False, {"icon": "mdi:message-text-outline"}),
+    ("last_event_time", "sensor", "Last Event Time", ("sensor", "last_event_time"), False, {"device_class": "timestamp", "icon": "mdi:clock-outline"}),
+)
+
 
 class BlinkMixin:
     async def refresh_device_list(self: Blink2Mqtt) -> None:
@@ -16,29 +56,40 @@ class BlinkMixin:
         else:
             self.logger.info("grabbing device list from Blink")
 
-        blink_devices, sync_modules = await asyncio.gather(
-            self.get_cameras(),
-            self.get_sync_modules(),
-        )
+        cameras: dict[str, Any] | BaseException
+        syncs: dict[str, Any] | BaseException
+        cameras, syncs = await asyncio.gather(self.get_cameras(), self.get_sync_modules(), return_exceptions=True)
+        # a failed lookup falls back to the last known list, so its devices aren't all marked offline below
+        if isinstance(cameras, BaseException):
+            self.logger.error(f"failed to get camera list from Blink: {cameras}")
+            blink_devices = self.blink_cameras
+        else:
+            blink_devices = cameras
+        if isinstance(syncs, BaseException):
+            self.logger.error(f"failed to get sync module list from Blink: {syncs}")
+            sync_modules = self.blink_sync_modules
+        else:
+            sync_modules = syncs
 
         await self.publish_service_state()
 
-        seen_devices: set[str] = set()
+        # camera builds query Blink (nightvision), so only let a few run at once
+        build_slots = asyncio.Semaphore(MAX_CONCURRENT_BUILDS)
 
-        async def build_and_track(device: dict[str, Any]) -> None:
-            created = await self.build_component(device)
-            if created:
-                seen_devices.add(created)
+        async def build(device: dict[str, Any]) -> str:
+            try:
+                async with build_slots:
+                    return await self.build_component(device)
+            except Exception:
+                # one bad device shouldn't abort the rest of the batch, nor get it marked offline below
+                self.logger.exception(f"failed to set up Blink device '{device.get('device_name', 'unknown')}'")
+                return cast(str, device.get("serial_number", ""))
 
-        tasks = [
-            *(build_and_track(d) for d in sync_modules.values()),
-            *(build_and_track(d) for d in blink_devices.values()),
-        ]
-        await asyncio.gather(*tasks)
+        results = await asyncio.gather(*map(build, chain(sync_modules.values(), blink_devices.values())))
+        seen_devices = {device_id for device_id in results if device_id}
 
         # Mark missing devices offline
-        missing_devices = set(self.devices.keys()) - seen_devices
-        for device_id in missing_devices:
+        for device_id in self.devices.keys() - seen_devices:
             await self.publish_device_availability(device_id, online=False)
             self.logger.warning(f"device '{self.get_device_name(device_id)}' not seen in Blink API list — marked offline")
 
@@ -47,7 +98,7 @@ class BlinkMixin:
         self.discovery_complete = True
 
     # convert Blink device capabilities into MQTT components
-    async def build_component(self: Blink2Mqtt, device: dict[str, str]) -> str:
+    async def build_component(self: Blink2Mqtt, device: dict[str, Any]) -> str:
         device_class = self.classify_device(device)
         match device_class:
             case "switch":
@@ -56,7 +107,7 @@ class BlinkMixin:
                 return await self.build_camera(device)
         return ""
 
-    def classify_device(self: Blink2Mqtt, device: dict[str, str]) -> str | None:
+    def classify_device(self: Blink2Mqtt, device: dict[str, Any]) -> str | None:
         device_type = device.get("device_type", None)
 
         if device_type == "sync_module":
@@ -73,216 +124,157 @@ class BlinkMixin:
         self.logger.warning(f"Blink device with no device_type: '{device_name}'")
         return None
 
-    async def build_switch(self: Blink2Mqtt, sync_module: dict[str, str]) -> str:
+    async def build_switch(self: Blink2Mqtt, sync_module: dict[str, Any]) -> str:
         device_id = sync_module["serial_number"]
-
-        device = {
-            "stat_t": self.mqtt_helper.stat_t(device_id, "state"),
-            "cmd_t": self.mqtt_helper.cmd_t(device_id, "switch", "armed"),
-            "avty_t": self.mqtt_helper.avty_t(device_id),
-            "device": {
-                "name": sync_module["device_name"],
-                "identifiers": [
-                    self.mqtt_helper.device_slug(device_id),
-                ],
-                "manufacturer": sync_module["vendor"],
-                "model": sync_module["device_type"],
-                "serial_number": sync_module["serial_number"],
-                "sw_version": sync_module["software_version"],
-                "via_device": self.service,
-            },
-            "origin": {"name": self.service_name, "sw": self.config["version"], "support_url": "https://github.com/weirdTangent/blink2mqtt"},
-            "qos": self.qos,
-            "cmps": {
-                "armed": {
-                    "platform": "switch",
-                    "name": "Armed",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "armed"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "switch", "armed"),
-                    "cmd_t": self.mqtt_helper.cmd_t(device_id, "switch", "armed"),
-                    "icon": "mdi:alarm-light",
+        # the component only depends on these, so skip rebuilding it when none of them changed
+        signature = (sync_module["device_name"], sync_module["vendor"], sync_module["device_type"], sync_module["software_version"])
+        if self.component_changed(device_id, signature):
+            armed_cmd_t = self.mqtt_helper.cmd_t(device_id, "switch", "armed")
+
+            device = {
+                "stat_t": self.mqtt_helper.stat_t(device_id, "state"),
+                "cmd_t": armed_cmd_t,
+                "avty_t": self.mqtt_helper.avty_t(device_id),
+                "device": {
+                    "name": sync_module["device_name"],
+                    "identifiers": [
+                        self.mqtt_helper.device_slug(device_id),
+                    ],
+                    "manufacturer": sync_module["vendor"],
+                    "model": sync_module["device_type"],
+                    "serial_number": sync_module["serial_number"],
+                    "sw_version": sync_module["software_version"],
+                    "via_device": self.service,
                 },
-                "local_storage": {
-                    "platform": "sensor",
-                    "name": "Local storage",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "local_storage"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "switch", "local_storage"),
-                    "icon": "mdi:usb-flash-drive",
+                "origin": {"name": self.service_name, "sw": self.config["version"], "support_url": "https://github.com/weirdTangent/blink2mqtt"},
+                "qos": self.qos,
+                "cmps": {
+                    "armed": {
+                        "platform": "switch",
+                        "name": "Armed",
+                        "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "armed"),
+                        "stat_t": self.mqtt_helper.stat_t(device_id, "switch", "armed"),
+                        "cmd_t": armed_cmd_t,
+                        "icon": "mdi:alarm-light",
+                    },
+                    "local_storage": {
+                        "platform": "sensor",
+                        "name": "Local storage",
+                        "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "local_storage"),
+                        "stat_t": self.mqtt_helper.stat_t(device_id, "switch", "local_storage"),
+                        "icon": "mdi:usb-flash-drive",
+                    },
                 },
-            },
-        }
-
-        self.upsert_device(device_id, component=device)
-        await self.build_sync_module_states(device_id, sync_module)
+            }
 
-        if not self.is_discovered(device_id):
-            self.logger.info(f"added sync module: \"{sync_module['device_name']}\" [Blink {sync_module['device_type']}] ('{self.get_device_name(device_id)}')")
+            self.upsert_device(device_id, component=device)
 
-        await self.publish_device_discovery(device_id)
-        await self.publish_device_availability(device_id, online=True)
-        await self.publish_device_state(device_id, publish_all=True)
+        await self.build_sync_module_states(device_id, sync_module)
 
-        return device_id
+        return await self.publish_built_device(device_id, "sync module", sync_module)
 
-    async def build_camera(self: Blink2Mqtt, camera: dict[str, str]) -> str:
+    async def build_camera(self: Blink2Mqtt, camera: dict[str, Any]) -> str:
         device_id = camera["serial_number"]
         via_device = self.resolve_camera_via_device(camera)
 
-        device = {
-            "stat_t": self.mqtt_helper.stat_t(device_id),
-            "avty_t": self.mqtt_helper.avty_t(device_id),
-            "device": {
-                "name": camera["device_name"],
-                "identifiers": [
-                    self.mqtt_helper.device_slug(device_id),
-                ],
-                "manufacturer": camera["vendor"],
-                "model": camera["device_type"],
-                "serial_number": camera["serial_number"],
-                "sw_version": camera["software_version"],
-                "via_device": via_device or self.service,
-            },
-            "origin": {"name": self.service_name, "sw": self.config["version"], "support_url": "https://github.com/weirdTangent/blink2mqtt"},
-            "qos": self.qos,
-            "cmps": {
-                "snapshot": {
-                    "platform": "camera",
-                    "name": "Snapshot",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "snapshot"),
-                    "topic": self.mqtt_helper.stat_t(device_id, "snapshot"),
-                    "image_encoding": "b64",
-                    "icon": "mdi:camera",
-                },
-                "eventshot": {
-                    "platform": "camera",
-                    "name": "Event Snapshot",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "eventshot"),
-                    "topic": self.mqtt_helper.stat_t(device_id, "eventshot"),
-                    "image_encoding": "b64",
-                    "icon": "mdi:camera",
-                },
-                "motion": {
-                    "platform": "binary_sensor",
-                    "name": "Motion",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "motion"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "binary_sensor", "motion"),
-                    "pl_on": True,
-                    "pl_off": False,
-                    "icon": "mdi:motion-sensor",
-                },
-                "motion_detection": {
-                    "platform": "switch",
-                    "name": "Motion Detection",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "motion_detection"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "switch", "motion_detection"),
-                    "cmd_t": self.mqtt_helper.cmd_t(device_id, "switch", "motion_detection"),
-                    "pl_on": "ON",
-                    "pl_off": "OFF",
-                    "icon": "mdi:motion-sensor",
-                },
-                "save_snapshots": {
-                    "platform": "switch",
-                    "name": "Save Snapshots",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "save_snapshots"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "switch", "save_snapshots"),
-                    "cmd_t": self.mqtt_helper.cmd_t(device_id, "switch", "save_snapshots"),
-                    "pl_on": "ON",
-                    "pl_off": "OFF",
-                    "icon": "mdi:content-save",
-                    "entity_category": "config",
-                },
-                "nightvision": {
-                    "platform": "select",
-                    "name": "Night Vision",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "nightvision"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "select", "nightvision"),
-                    "cmd_t": self.mqtt_helper.cmd_t(device_id, "select", "nightvision"),
-                    "options": ["auto", "on", "off"],
-                    "icon": "mdi:light-flood-down",
-                    "enabled_by_default": camera["supports_get_config"],
-                },
-                "temperature": {
-                    "platform": "sensor",
-                    "name": "Temperature",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "temperature"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "sensor", "temperature"),
-                    "device_class": "temperature",
-                    "state_class": "measurement",
-                    "unit_of_measurement": "°F",
-                    "icon": "mdi:thermometer",
-                    "entity_category": "diagnostic",
-                },
-                "battery_status": {
-                    "platform": "sensor",
-                    "name": "Battery Status",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "battery_status"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "sensor", "battery_status"),
-                    "entity_category": "diagnostic",
-                    "icon": "mdi:battery-alert",
-                },
-                "wifi_signal": {
-                    "platform": "sensor",
-                    "name": "Wifi Signal",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "wifi_signal"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "sensor", "wifi_signal"),
-                    "device_class": "signal_strength",
-                    "unit_of_measurement": "dBm",
-                    "icon": "mdi:wifi",
-                    "entity_category": "diagnostic",
-                },
-                "last_event": {
-                    "platform": "sensor",
-                    "name": "Last Event",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "last_event"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "sensor", "last_event"),
-                    "icon": "mdi:message-text-outline",
-                },
-                "last_event_time": {
-                    "platform": "sensor",
-                    "name": "Last Event Time",
-                    "uniq_id": self.mqtt_helper.dev_unique_id(device_id, "last_event_time"),
-                    "stat_t": self.mqtt_helper.stat_t(device_id, "sensor", "last_event_time"),
-                    "device_class": "timestamp",
-                    "icon": "mdi:clock-outline",
+        signature = (
+            camera["device_name"],
+            camera["vendor"],
+            camera["device_type"],
+            camera["software_version"],
+            camera["supports_get_config"],
+            via_device,
+        )
+        if self.component_changed(device_id, signature):
+            device = {
+                "stat_t": self.mqtt_helper.stat_t(device_id),
+                "avty_t": self.mqtt_helper.avty_t(device_id),
+                "device": {
+                    "name": camera["device_name"],
+                    "identifiers": [
+                        self.mqtt_helper.device_slug(device_id),
+                    ],
+                    "manufacturer": camera["vendor"],
+                    "model": camera["device_type"],
+                    "serial_number": camera["serial_number"],
+                    "sw_version": camera["software_version"],
+                    "via_device": via_device or self.service,
                 },
-            },
-        }
+                "origin": {"name": self.service_name, "sw": self.config["version"], "support_url": "https://github.com/weirdTangent/blink2mqtt"},
+                "qos": self.qos,
+                "cmps": self.build_camera_components(device_id, camera),
+            }
+
+            self.upsert_device(device_id, component=device)
 
-        self.upsert_device(device_id, component=device)
         await self.build_camera_states(device_id, camera)
 
-        if not self.is_discovered(device_id):
-            self.logger.info(f"added camera: \"{camera['device_name']}\" [Blink {camera['device_type']}] ('{self.get_device_name(device_id)}')")
+        return await self.publish_built_device(device_id, "camera", camera)
+
+    def component_changed(self: Blink2Mqtt, device_id: str, signature: tuple[Any, ...]) -> bool:
+        previous = self.component_signatures.get(device_id)
+        if previous == signature:
+            return False
+        self.component_signatures[device_id] = signature
+        if previous is not None and self.is_discovered(device_id):
+            # name, firmware or capabilities changed, so Home Assistant needs the new discovery payload
+            self.upsert_state(device_id, internal={"discovered": False})
+        return True
+
+    async def publish_built_device(self: Blink2Mqtt, device_id: str, kind: str, source: dict[str, Any]) -> str:
+        # once discovered, later rescans only need to send the states that changed
+        discovered = self.is_discovered(device_id)
+        if not discovered:
+            self.logger.info(f"added {kind}: \"{source['device_name']}\" [Blink {source['device_type']}] ('{self.get_device_name(device_id)}')")
             await self.publish_device_discovery(device_id)
 
         await self.publish_device_availability(device_id, online=True)
-        await self.publish_device_state(device_id, publish_all=True)
+        await self.publish_device_state(device_id, publish_all=not discovered)
 
         return device_id
 
+    def build_camera_components(self: Blink2Mqtt, device_id: str, camera: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        cmps: dict[str, dict[str, Any]] = {}
+        for key, platform, name, parts, commandable, extra in _CAMERA_COMPONENTS:
+            component: dict[str, Any] = {
+                "platform": platform,
+                "name": name,
+                "uniq_id": self.mqtt_helper.dev_unique_id(device_id, key),
+            }
+            # camera entities take an image topic rather than a state topic
+            component["topic" if platform == "camera" else "stat_t"] = self.get_state_topic(device_id, *parts)
+            if commandable:
+                component["cmd_t"] = self.mqtt_helper.cmd_t(device_id, *parts)
+            cmps[key] = {**component, **extra}
+
+        cmps["nightvision"]["options"] = ["auto", "on", "off"]
+        cmps["nightvision"]["enabled_by_default"] = camera["supports_get_config"]
+        return cmps
+
+    def index_sync_modules(self: Blink2Mqtt) -> None:
+        """Map every identifier a camera might use for its sync module to that module's MQTT device slug."""
+        index: dict[str, str] = {}
+        for device_id, device in self.blink_sync_modules.items():
+            slug = cast(str, self.mqtt_helper.device_slug(device_id))
+            for value in (device_id, device.get("serial_number"), device.get("device_name"), device.get("sync_id"), device.get("network_id")):
+                normalized = _normalize_sync_ref(value)
+                if normalized:
+                    # first module wins, same as scanning blink_sync_modules in order
+                    index.setdefault(normalized, slug)
+        self.sync_module_slugs = index
+
     def resolve_camera_via_device(self: Blink2Mqtt, camera: dict[str, Any]) -> str | None:
         """Return the MQTT device slug for the sync module a camera reports."""
-
-        def normalize(value: Any) -> str | None:
-            if value is None:
-                return None
-            if isinstance(value, bool):
-                return str(int(value))
-            if isinstance(value, (int, float)):
-                return str(int(value))
-            value = str(value).strip()
-            return value or None
-
         sync_ref = camera.get("sync_module")
         if not sync_ref:
             return None
 
-        candidate_values: set[str] = set()
+        candidate_values: dict[str, None] = {}
 
         def add_candidate(value: Any) -> None:
-            normalized = normalize(value)
+            normalized = _normalize_sync_ref(value)
             if normalized:
-                candidate_values.add(normalized)
+                candidate_values[normalized] = None
 
         if isinstance(sync_ref, dict):
             for key in ("serial", "serial_number", "device_id", "id", "network_id", "name"):
@@ -295,19 +287,20 @@ class BlinkMixin:
                 add_candidate(getattr(sync_ref, attr, None))
             add_candidate(sync_ref)
 
-        if not candidate_values:
-            return None
-
-        for device_id, device in self.blink_sync_modules.items():
-            sync_candidates = {
-                normalize(device_id),
-                normalize(device.get("serial_number")),
-                normalize(device.get("device_name")),
-                normalize(device.get("sync_id")),
-                normalize(device.get("network_id")),
-            }
-            if candidate_values & {value for value in sync_candidates if value}:
-                slug = cast(str, self.mqtt_helper.device_slug(device_id))
+        for value in candidate_values:
+            slug = self.sync_module_slugs.get(value)
+            if slug:
                 return slug
 
         return None
+
+
+def _normalize_sync_ref(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return str(int(value))
+    value = str(value).strip()
+    return value or None
@@ -2,22 +2,33 @@
 # Copyright (c) 2025 Jeff Culverhouse
 from __future__ import annotations
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession, TCPConnector
 import asyncio
 from asyncio import timeout
-import base64
+from binascii import b2a_base64
 from blinkpy.auth import Auth, BlinkTwoFARequiredError, UnauthorizedError
 from blinkpy.blinkpy import Blink
 from blinkpy.helpers.util import json_load
-from datetime import datetime
+from datetime import date, datetime
 import json
+import orjson
 import os
+import random
 
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from blink2mqtt.interface import BlinkServiceProtocol as Blink2Mqtt
 
+# recording files that are still images rather than clips
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg")
+
+# largest base64-encoded recording we'll send over MQTT
+_MAX_RECORDING_BASE64 = 100 * 1024 * 1024
+
+# seconds between checks for key.txt while waiting on 2FA
+_KEY_FILE_POLL_INTERVAL = 2
+
 
 class BlinkAPIMixin(object):
     async def publish_vision_request(self: Blink2Mqtt, device_id: str, image_b64: str, source: str) -> None:
@@ -33,36 +44,32 @@ class BlinkAPIMixin(object):
             "timestamp": now.isoformat(timespec="seconds"),
             "source": source,
         }
-        await asyncio.to_thread(self.mqtt_helper.safe_publish, topic, json.dumps(payload))
-        self.logger.debug(f"published vision request for '{self.get_device_name(device_id)}' ({source})")
+        self.queue_publish(topic, orjson.dumps(payload))
+        self.logger.debug(f"queued vision request for '{self.get_device_name(device_id)}' ({source})")
 
     def increase_api_calls(self: Blink2Mqtt) -> None:
-        today = str(datetime.now().date())
-        if not self.last_call_date or self.last_call_date != today:
+        if self.last_call_date != date.today():
             self.reset_api_call_count()
         self.api_calls += 1
 
     def reset_api_call_count(self: Blink2Mqtt) -> None:
         self.api_calls = 0
-        self.last_call_date = str(datetime.now().date())
+        self.last_call_date = date.today()
 
     # connect/disconnect to blink  ----------------------------------------------------------------
 
     async def connect(self: Blink2Mqtt) -> None:
-        if self.session and not self.session.closed:
-            await self.session.close()
-
-        self.session = ClientSession()
+        # one long-lived session for the life of the service; keep-alive outlasts the 30s refresh interval,
+        # so blink.refresh() reuses its TLS connections instead of handshaking with Blink again each cycle
+        if not self.session or self.session.closed:
+            self.session = ClientSession(connector=TCPConnector(ttl_dns_cache=300, keepalive_timeout=75))
         self.blink = Blink(session=self.session)
 
-        cred_path = os.path.join(self.config["config_path"], "blink.cred")
-        key_path = os.path.join(self.config["config_path"], "key.txt")
-
         # choose credential source
         auth: Auth | None = None
-        if os.path.exists(cred_path):
+        if await asyncio.to_thread(os.path.exists, self.cred_path):
             self.logger.info("using existing Blink credentials")
-            creds = await json_load(cred_path)
+            creds = await json_load(self.cred_path)
             auth = Auth(creds, no_prompt=True)
         elif self.blink_config.get("username") and self.blink_config.get("password"):
             self.logger.info("using username/password from config")
@@ -85,7 +92,7 @@ class BlinkAPIMixin(object):
             await self.blink.start()
         except UnauthorizedError:
             self.logger.error("stored credentials invalid — deleting and exiting")
-            await asyncio.to_thread(os.remove, cred_path)
+            await asyncio.to_thread(os.remove, self.cred_path)
             raise SystemExit(1)
 
         except BlinkTwoFARequiredError:
@@ -93,24 +100,26 @@ class BlinkAPIMixin(object):
 
             async def wait_for_key_file(timeout: int = 600) -> str | None:
                 """Poll for the presence of key.txt asynchronously."""
-                for _ in range(timeout):
-                    if os.path.exists(key_path):
-                        return await asyncio.to_thread(self.read_file, key_path)
-                    await asyncio.sleep(1)
+                for _ in range(timeout // _KEY_FILE_POLL_INTERVAL):
+                    if await asyncio.to_thread(os.path.exists, self.key_path):
+                        return await asyncio.to_thread(self.read_file, self.key_path)
+                    await asyncio.sleep(_KEY_FILE_POLL_INTERVAL)
                 return None
 
             key = await wait_for_key_file()
             if not key:
                 self.logger.error("2FA key file not found in time. Cleaning up and aborting.")
-                await asyncio.gather(*[asyncio.to_thread(os.remove, p) for p in (cred_path, key_path) if os.path.exists(p)])
+                for path in (self.cred_path, self.key_path):
+                    if await asyncio.to_thread(os.path.exists, path):
+                        await asyncio.to_thread(os.remove, path)
                 raise SystemExit(1)
 
             self.logger.info("found key.txt, completing 2FA process")
             try:
-                await asyncio.to_thread(os.remove, key_path)
+                await asyncio.to_thread(os.remove, self.key_path)
                 await self.blink.send_2fa_code(key)
                 await self.blink.setup_post_verify()
-                await self.blink.save(cred_path)
+                await self.blink.save(self.cred_path)
                 self.increase_api_calls()
                 await self.blink.refresh()
                 return
@@ -120,11 +129,10 @@ class BlinkAPIMixin(object):
         # normal successful auth path
         self.increase_api_calls()
         await self.blink.refresh()
-        await self.blink.save(cred_path)
+        await self.blink.save(self.cred_path)
 
     async def disconnect(self: Blink2Mqtt) -> None:
-        cred_path = os.path.join(self.config["config_path"], "blink.cred")
-        await self.blink.save(cred_path)
+        await self.blink.save(self.cred_path)
         if self.session:
             await self.session.close()
 
@@ -168,8 +176,10 @@ class BlinkAPIMixin(object):
         return self.blink_cameras
 
     async def get_sync_modules(self: Blink2Mqtt) -> dict[str, Any]:
-        for _, sync_module in self.blink.sync.items():
-            await sync_module.get_network_info()
+        sync_modules = list(self.blink.sync.values())
+        # network info is fetched per module, so ask for all of them at once
+        await asyncio.gather(*map(self.refresh_sync_module_info, sync_modules))
+        for sync_module in sync_modules:
             attributes = sync_module.attributes
             self.blink_sync_modules[attributes["serial"]] = {
                 "device_name": attributes["name"],
@@ -188,8 +198,25 @@ class BlinkAPIMixin(object):
                 "last_records": sync_module.last_records,
                 "local_storage": attributes["local_storage"],
             }
+        self.index_sync_modules()
         return self.blink_sync_modules
 
+    async def refresh_sync_module_info(self: Blink2Mqtt, sync_module: Any) -> None:
+        # a slow or flaky network-info call shouldn't stall the whole refresh; fall back to what blinkpy last had
+        max_retries = 3
+
+        for attempt in range(1, max_retries + 1):
+            try:
+                async with timeout(10):
+                    await sync_module.get_network_info()
+                    return
+            except (TimeoutError, ClientError) as err:
+                self.logger.debug("[get_sync_modules] network info attempt %s failed for '%s': %s", attempt, sync_module.name, err)
+                if attempt < max_retries:
+                    await asyncio.sleep(_backoff_delay(attempt))
+
+        self.logger.warning(f"[get_sync_modules] using last known network info for '{sync_module.name}' after {max_retries} failed attempts")
+
     async def handle_blink_response(self: Blink2Mqtt, response: str | dict[str, Any]) -> bool | None:
         if response and isinstance(response, dict):
             if response.get("code", 200) == 307:
@@ -214,7 +241,7 @@ class BlinkAPIMixin(object):
         try:
             async with timeout(5):
                 response = await device.async_arm(switch)
-                self.logger.debug(f"set arm mode/motion detection for '{self.get_device_name(device_id)}': {response}")
+                self.logger.debug("set arm mode/motion detection for '%s': %s", self.get_device_name(device_id), response)
                 return response
         except asyncio.TimeoutError:
             self.logger.error(f"[set_arm_mode/motion detection] timed out for '{self.get_device_name(device_id)}'")
@@ -235,7 +262,7 @@ class BlinkAPIMixin(object):
 
         try:
             response = await camera.night_vision
-            self.logger.debug(f"[get_nightvision] response for '{self.get_device_name(device_id)}': {json.dumps(response)}")
+            self.logger.debug("[get_nightvision] response for '%s': %s", self.get_device_name(device_id), response)
             return response and str(response.get("illuminator_enable", ""))
             # {'nightvision_control': None, 'illuminator_enable': 'auto', 'illuminator_enable_v2': None}
         except asyncio.TimeoutError:
@@ -249,13 +276,12 @@ class BlinkAPIMixin(object):
         device = self.blink_cameras[device_id]
         camera = self.blink.cameras[device["name"]]
         max_retries = 5
-        base_delay = 2
 
         for attempt in range(1, max_retries + 1):
             try:
                 async with timeout(5):
                     response = await camera.async_set_night_vision(switch)
-                    self.logger.debug(f"set nightvision for '{self.get_device_name(device_id)}': {response}")
+                    self.logger.debug("set nightvision for '%s': %s", self.get_device_name(device_id), response)
                     result = await self.handle_blink_response(response)
                     if result is None:
                         continue
@@ -265,7 +291,7 @@ class BlinkAPIMixin(object):
                     f"[set_nightvision] failed for attempt {attempt} for {self.get_device_name(device_id)}: {err}",
                     exc_info=True,
                 )
-                await asyncio.sleep(base_delay * attempt)
+                await asyncio.sleep(_backoff_delay(attempt))
 
         self.logger.error(f"[set_nightvision] failed for '{self.get_device_name(device_id)}' after {max_retries} retries")
         return None
@@ -283,12 +309,11 @@ class BlinkAPIMixin(object):
             self.logger.error(f"[set_motion_detection] unknown device id: '{self.get_device_name(device_id)}'")
             return None
         max_retries = 5
-        base_delay = 2
 
         for attempt in range(1, max_retries + 1):
             try:
                 response = await device.async_arm(switch)
-                self.logger.debug(f"set motion detection for '{self.get_device_name(device_id)}': {response}")
+                self.logger.debug("set motion detection for '%s': %s", self.get_device_name(device_id), response)
                 result = await self.handle_blink_response(response)
                 if result is None:
                     continue
@@ -298,7 +323,7 @@ class BlinkAPIMixin(object):
                     f"[set_motion_detection] failed for attempt {attempt} for {self.get_device_name(device_id)}: {err}",
                     exc_info=True,
                 )
-                await asyncio.sleep(base_delay * attempt)
+                await asyncio.sleep(_backoff_delay(attempt))
 
         self.logger.error(f"[set_motion_detection] failed for '{self.get_device_name(device_id)}' after {max_retries} retries")
         return None
@@ -331,7 +356,7 @@ class BlinkAPIMixin(object):
             if not image:
                 self.logger.info(f"[get_snapshot_from_device] Empty cache for '{self.get_device_name(device_id)}', skipping.")
                 return None
-            encoded = base64.b64encode(image).decode("utf-8")
+            encoded = b2a_base64(image, newline=False).decode("ascii")
             return encoded
         except Exception as err:
             self.logger.error(f"[get_snapshot_from_device] failed for '{self.get_device_name(device_id)}': {err}")
@@ -351,15 +376,16 @@ class BlinkAPIMixin(object):
 
         for attempt in range(1, max_retries + 1):
             try:
-                data_raw = camera.download_file(file)
+                data_raw = await asyncio.get_running_loop().run_in_executor(self.blink_executor, camera.download_file, file)
                 if data_raw:
-                    data_base64 = base64.b64encode(data_raw).decode("utf-8")
+                    # base64 output size is known up front, so oversized recordings are never encoded
+                    if 4 * -(-len(data_raw) // 3) >= _MAX_RECORDING_BASE64:
+                        self.logger.error(f"[get_recorded_file] skipping oversized recording (>100 MB) for '{self.get_device_name(device_id)}'")
+                        return None
+                    data_base64 = b2a_base64(data_raw, newline=False).decode("ascii")
                     self.logger.info(
                         f"[get_recorded_file] processed recording from ({self.get_device_name(device_id)}) {len(data_raw)} bytes raw, and {len(data_base64)} bytes base64"
                     )
-                    if len(data_base64) >= 100 * 1024 * 1024:
-                        self.logger.error(f"[get_recorded_file] skipping oversized recording (>100 MB) for '{self.get_device_name(device_id)}'")
-                        return None
                     return data_base64
             except Exception as err:
                 self.logger.warning(f"[get_recorded_file] failed for attempt {attempt} for '{self.get_device_name(device_id)}': {err}")
@@ -440,58 +466,72 @@ class BlinkAPIMixin(object):
                 pass
             # save everything else as a 'generic' event
             else:
-                self.logger.debug(f"event on '{self.get_device_name(device_id)}' - {code}: {payload}")
+                self.logger.debug("event on '%s' - %s: %s", self.get_device_name(device_id), code, payload)
                 self.events.append({"device_id": device_id, "event": code, "payload": payload})
         except Exception as err:
             self.logger.error(f"[queue_device_event] Failed to understand event from '{self.get_device_name(device_id)}': {err}", exc_info=True)
 
-    def get_next_event(self: Blink2Mqtt) -> dict[str, Any] | None:
-        return self.events.pop(0) if len(self.events) > 0 else None
+        if self.events:
+            self.events_ready.set()
 
-    async def process_events(self: Blink2Mqtt) -> None:
-        try:
-            while device_event := self.get_next_event():
-                if "device_id" not in device_event:
-                    self.logger.debug(f"[process_events] Got event but it's missing a device_id: {device_event}")
-                    continue
+    def drain_events(self: Blink2Mqtt) -> list[dict[str, Any]]:
+        # hand back everything queued so far in one go, leaving the queue empty
+        events = self.events.copy()
+        self.events.clear()
+        return events
 
+    async def process_events(self: Blink2Mqtt) -> None:
+        # a burst of events for one device (motion + human + recording) only needs one state publish
+        updated_devices: set[str] = set()
+        for device_event in self.drain_events():
+            try:
                 device_id = device_event["device_id"]
                 event = device_event["event"]
                 payload = device_event["payload"]
                 states = self.states.get(device_id, None)
                 if not states:
-                    self.logger.debug(f"[process_events] Got event for device_id we don't know: {device_event}")
+                    self.logger.debug("[process_events] Got event for device_id we don't know: %s", device_event)
                     continue
 
-                # if one of our known sensors
-                if event in ["motion", "human", "doorbell", "recording", "privacy_mode"]:
-                    if event == "recording" and payload["file"].endswith(".jpg"):
+                match event:
+                    case "recording" if payload["file"].endswith(_IMAGE_EXTENSIONS):
                         image = await self.get_recorded_file(device_id, payload["file"])
                         if not image:
                             self.logger.error(f"[process_events] failed to get recorded file for '{self.get_device_name(device_id)}': {payload["file"]}")
                             continue
-                        # only store and send to MQTT if we got an image AND the image has changed
-                        if image and (states["eventshot"] is None or states["eventshot"] != image):
+                        # only store and send to MQTT if the image has changed
+                        if states.get("eventshot") != image:
                             states["eventshot"] = image
                             await self.publish_device_image(device_id, "eventshot")
                             await self.publish_vision_request(device_id, image, "recording_snapshot")
-                    else:
-                        # only log details if not a recording
-                        if event != "recording":
-                            self.logger.debug(f"got event for '{self.get_device_name(device_id)}': {event} - {payload}")
+                    case "recording":
+                        # non-image recordings only update last_event, no need to log the details
+                        self.upsert_state(device_id, last_event=f"{event}: {json.dumps(payload)}", last_event_time=str(datetime.now()))
+                    case "motion" | "human" | "doorbell" | "privacy_mode":
+                        self.logger.debug("got event for '%s': %s - %s", self.get_device_name(device_id), event, payload)
                         self.upsert_state(device_id, last_event=f"{event}: {json.dumps(payload)}", last_event_time=str(datetime.now()))
 
                         # publish latest snapshot as vision request on motion start
                         if event == "motion" and isinstance(payload, dict) and payload.get("state") == "on" and states.get("snapshot"):
                             await self.publish_vision_request(device_id, states["snapshot"], "motion_snapshot")
 
-                    # other ways to infer "privacy mode" is off and needs updating
-                    # if event in ['motion','human','doorbell'] and states['privacy_mode'] == 'on':
-                    # states['privacy_mode'] = 'off'
-                else:
-                    self.logger.debug(f"got {{{event}: {payload}}} for '{self.get_device_name(device_id)}'")
-                    self.upsert_state(device_id, last_event=f"{event}: {json.dumps(payload)}", last_event_time=str(datetime.now()))
+                        # other ways to infer "privacy mode" is off and needs updating
+                        # if event in ['motion','human','doorbell'] and states['privacy_mode'] == 'on':
+                        # states['privacy_mode'] = 'off'
+                    case _:
+                        self.logger.debug("got {%s: %s} for '%s'", event, payload, self.get_device_name(device_id))
+                        self.upsert_state(device_id, last_event=f"{event}: {json.dumps(payload)}", last_event_time=str(datetime.now()))
 
-                await self.publish_device_state(device_id)
-        except Exception as err:
-            self.logger.error(f"[process_events] Failed trying to process event: {err}", exc_info=True)
+                updated_devices.add(device_id)
+            except Exception as err:
+                # the queue is already drained, so skip just this event rather than the rest of the batch
+                self.logger.error(f"[process_events] Failed trying to process event: {err}", exc_info=True)
+
+        for device_id in updated_devices:
+            await self.publish_device_state(device_id)
+
+
+def _backoff_delay(attempt: int, base: float = 2, cap: float = 10) -> float:
+    # exponential with jitter, so retries against a busy Blink don't all come back at once
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return random.uniform(delay / 2, delay)
@@ -22,9 +22,16 @@ if TYPE_CHECKING:
 
 READY_FILE = os.getenv("READY_FILE", "/tmp/blink2mqtt.ready")
 
+# shared by upsert_device/upsert_state; the merger holds no per-call state, so build it once
+_MERGER = Merger(
+    [(dict, "merge"), (list, "append_unique"), (set, "union")],
+    ["override"],  # type conflicts: new wins
+    ["override"],  # fallback
+)
+
 
 class HelpersMixin:
-    async def build_camera_states(self: Blink2Mqtt, device_id: str, device: dict[str, str]) -> None:
+    async def build_camera_states(self: Blink2Mqtt, device_id: str, device: dict[str, Any]) -> None:
         # update states for cameras
         if device_id in self.blink_cameras:
             device = self.blink_cameras[device_id]
@@ -84,7 +91,7 @@ class HelpersMixin:
         except Exception as err:
             self.logger.error(f"[_capture_and_publish_vision] failed for '{name}': {err}", exc_info=True)
 
-    async def build_sync_module_states(self: Blink2Mqtt, device_id: str, sync_module: dict[str, str]) -> None:
+    async def build_sync_module_states(self: Blink2Mqtt, device_id: str, sync_module: dict[str, Any]) -> None:
         self.upsert_state(
             device_id,
             switch={"armed": "ON" if sync_module["arm_mode"] else "OFF"},
@@ -149,8 +156,10 @@ class HelpersMixin:
         await self.publish_service_state()
         await self.publish_service_discovery()
         for device_id in self.devices:
-            await self.publish_device_state(device_id, publish_all=True)
+            # discovery is otherwise sent once per device, so clear the flag to resend the cached payload
+            self.upsert_state(device_id, internal={"discovered": False})
             await self.publish_device_discovery(device_id)
+            await self.publish_device_state(device_id, publish_all=True)
 
     # utilities -----------------------------------------------------------------------------------
 
@@ -159,6 +168,10 @@ class HelpersMixin:
         self.logger.warning(f"{sig_name} received - stopping service loop")
         self.running = False
 
+        # wake the loops main_loop started (and only those) so they can wind down now
+        for task in self.tasks:
+            self.loop.call_soon_threadsafe(task.cancel)
+
         def _force_exit() -> None:
             self.logger.warning("force-exiting process after signal")
             os._exit(0)
@@ -252,6 +265,7 @@ class HelpersMixin:
             "tls_key":                         mqtt.get("tls_key")                      or os.getenv("MQTT_TLS_KEY"),
             "prefix":                          mqtt.get("prefix")                       or os.getenv("MQTT_PREFIX", "blink2mqtt"),
             "discovery_prefix":                mqtt.get("discovery_prefix")             or os.getenv("MQTT_DISCOVERY_PREFIX", "homeassistant"),
+            "compact_discovery":               mqtt.get("compact_discovery")            or (os.getenv("MQTT_COMPACT_DISCOVERY", "false").lower() == "true"),
         }
 
         blink = {
@@ -316,7 +330,11 @@ class HelpersMixin:
     # Device properties ---------------------------------------------------------------------------
 
     def get_device_name(self: Blink2Mqtt, device_id: str) -> str:
-        return cast(str, self.devices[device_id]["component"]["device"]["name"])
+        # names are cached by upsert_device, fall back to the component for anything set up directly
+        name = self.device_names.get(device_id)
+        if name is None:
+            name = cast(str, self.devices[device_id]["component"]["device"]["name"])
+        return name
 
     def get_device_name_slug(self: Blink2Mqtt, device_id: str) -> str:
         return re.sub(r"[^a-zA-Z0-9]+", "_", self.get_device_name(device_id).lower())
@@ -332,6 +350,13 @@ class HelpersMixin:
             return False
         return cast(bool, self.states[device_id]["internal"].get("discovered", False))
 
+    def get_state_topic(self: Blink2Mqtt, device_id: str, *parts: str) -> str:
+        key = (device_id, *parts)
+        topic = self.state_topics.get(key)
+        if topic is None:
+            topic = self.state_topics[key] = cast(str, self.mqtt_helper.stat_t(device_id, *parts))
+        return topic
+
     def get_device_state_topic(self: Blink2Mqtt, device_id: str, mode_name: str = "") -> str:
         component = self.get_component(device_id)["cmps"][f"{device_id}_{mode_name}"] if mode_name else self.get_component(device_id)
 
@@ -471,41 +496,45 @@ class HelpersMixin:
                 self._assert_no_tuples(value, f"{path}[{idx}]")
 
     def upsert_device(self: Blink2Mqtt, device_id: str, **kwargs: dict[str, Any] | str | int | bool | None) -> bool:
-        MERGER = Merger(
-            [(dict, "merge"), (list, "append_unique"), (set, "union")],
-            ["override"],  # type conflicts: new wins
-            ["override"],  # fallback
-        )
         prev = self.devices.get(device_id, {})
         for section, data in kwargs.items():
             # Pre-merge check
             self._assert_no_tuples(data, f"device[{device_id}].{section}")
-            merged = MERGER.merge(self.devices.get(device_id, {}), {section: data})
+            merged = _MERGER.merge(self.devices.get(device_id, {}), {section: data})
             # Post-merge check
             self._assert_no_tuples(merged, f"device[{device_id}].{section} (post-merge)")
             self.devices[device_id] = merged
         new = self.devices.get(device_id, {})
+        if "component" in kwargs:
+            self.discovery_payloads.pop(device_id, None)
+        name = new.get("component", {}).get("device", {}).get("name")
+        if name:
+            self.device_names[device_id] = name
         return False if prev == new else True
 
     def upsert_state(self: Blink2Mqtt, device_id: str, **kwargs: dict[str, Any] | str | int | bool | None) -> bool:
-        MERGER = Merger(
-            [(dict, "merge"), (list, "append_unique"), (set, "union")],
-            ["override"],  # type conflicts: new wins
-            ["override"],  # fallback
-        )
         prev = self.states.get(device_id, {})
         if device_id not in self.dirty:
             self.dirty[device_id] = set()
         for section, data in kwargs.items():
             self._assert_no_tuples(data, f"state[{device_id}].{section}")
-            merged = MERGER.merge(self.states.get(device_id, {}), {section: data})
-            self._assert_no_tuples(merged, f"state[{device_id}].{section} (post-merge)")
-            self.states[device_id] = merged
-            # track which (section, key) pairs were touched for dicts
+            # track which (section, key) pairs actually change, so re-sending the same values doesn't republish them
+            current = self.states.get(device_id, {}).get(section)
             if isinstance(data, dict):
-                for k in data:
-                    self.dirty[device_id].add((section, k))
-            else:
+                for k, v in data.items():
+                    if not isinstance(current, dict) or k not in current or _changes(current[k], v):
+                        self.dirty[device_id].add((section, k))
+            elif _changes(current, data):
                 self.dirty[device_id].add((section, ""))
+            merged = _MERGER.merge(self.states.get(device_id, {}), {section: data})
+            self._assert_no_tuples(merged, f"state[{device_id}].{section} (post-merge)")
+            self.states[device_id] = merged
         new = self.states.get(device_id, {})
         return False if prev == new else True
+
+
+def _changes(current: Any, new: Any) -> bool:
+    # lists merge append_unique, so a stored list only changes when new items arrive
+    if isinstance(current, list) and isinstance(new, list):
+        return any(item not in current for item in new)
+    return bool(current != new)
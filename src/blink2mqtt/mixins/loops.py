@@ -9,6 +9,10 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from blink2mqtt.interface import BlinkServiceProtocol as Blink2Mqtt
 
+# buffered state publishes are flushed after a short pause, or right away once a full batch is waiting
+PUBLISH_BATCH_SIZE = 32
+PUBLISH_FLUSH_INTERVAL = 0.05
+
 
 class LoopsMixin:
     async def device_list_loop(self: Blink2Mqtt) -> None:
@@ -68,10 +72,25 @@ class LoopsMixin:
     async def process_events_loop(self: Blink2Mqtt) -> None:
         while self.running:
             try:
-                await asyncio.sleep(1)
+                # woken by queue_device_event rather than polling an empty queue
+                await self.events_ready.wait()
+                self.events_ready.clear()
                 await self.process_events()
             except asyncio.CancelledError:
-                self.logger.debug("process_events_loop cancelled during sleep")
+                self.logger.debug("process_events_loop cancelled during wait")
+                break
+
+    async def publish_flush_loop(self: Blink2Mqtt) -> None:
+        while self.running:
+            try:
+                await self.publish_pending.wait()
+                self.publish_pending.clear()
+                # let the rest of a burst pile up, unless a full batch is already waiting
+                if len(self.publish_buffer) < PUBLISH_BATCH_SIZE:
+                    await asyncio.sleep(PUBLISH_FLUSH_INTERVAL)
+                await self.flush_publish_buffer()
+            except asyncio.CancelledError:
+                self.logger.debug("publish_flush_loop cancelled during wait")
                 break
 
     async def cleanup_snapshots_loop(self: Blink2Mqtt) -> None:
@@ -114,7 +133,7 @@ class LoopsMixin:
         self.running = True
         self.mark_ready()
 
-        tasks = [
+        self.tasks = [
             asyncio.create_task(self.device_list_loop(), name="device_list_loop"),
             asyncio.create_task(self.device_loop(), name="device_loop"),
             asyncio.create_task(self.collect_snapshots_loop(), name="collect_snapshots_loop"),
@@ -122,11 +141,12 @@ class LoopsMixin:
             # asyncio.create_task(self.collect_events_loop(), name="collect_events_loop"),
             # asyncio.create_task(self.process_events_loop(), name="process_events_loop"),
             asyncio.create_task(self.cleanup_snapshots_loop(), name="cleanup_snapshots_loop"),
+            asyncio.create_task(self.publish_flush_loop(), name="publish_flush_loop"),
             asyncio.create_task(self.heartbeat(), name="heartbeat"),
         ]
 
         try:
-            await asyncio.gather(*tasks)
+            await asyncio.gather(*self.tasks)
         except asyncio.CancelledError:
             self.logger.warning("main loop cancelled — shutting down...")
         except Exception as err:
@@ -38,7 +38,7 @@ class MqttMixin(BaseMqttMixin):
         if components[0] == self.mqtt_helper.service_slug:
             return await self.handle_device_topic(components, payload)
 
-        self.logger.debug(f"ignoring unrelated MQTT topic: {topic}")
+        self.logger.debug("ignoring unrelated MQTT topic: %s", topic)
 
     async def handle_homeassistant_message(self: Blink2Mqtt, payload: str) -> None:
         if payload == "online":
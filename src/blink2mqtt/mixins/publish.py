@@ -3,12 +3,22 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+
+import orjson
 
 if TYPE_CHECKING:
     from blink2mqtt.interface import BlinkServiceProtocol as Blink2Mqtt
 
+# Home Assistant's abbreviated discovery keys, applied to each component when compact_discovery is enabled
+_COMPACT_KEYS = {
+    "device_class": "dev_cla",
+    "state_class": "stat_cla",
+    "unit_of_measurement": "unit_of_meas",
+    "entity_category": "ent_cat",
+    "enabled_by_default": "en",
+}
+
 
 class PublishMixin:
 
@@ -123,13 +133,13 @@ class PublishMixin:
         }
 
         topic = self.mqtt_helper.disc_t("device", device_id)
-        await asyncio.to_thread(self.mqtt_helper.safe_publish, topic, json.dumps(device))
-        self.upsert_state(device_id, internal={"discovered": True})
-
-        self.logger.debug(f"discovery published for {self.service} ({self.mqtt_helper.service_slug})")
+        self.queue_publish(topic, orjson.dumps(device))
+        if await self.flush_publish_buffer():
+            self.upsert_state(device_id, internal={"discovered": True})
+            self.logger.debug(f"discovery published for {self.service} ({self.mqtt_helper.service_slug})")
 
     async def publish_service_availability(self: Blink2Mqtt, status: str = "online") -> None:
-        await asyncio.to_thread(self.mqtt_helper.safe_publish, self.mqtt_helper.avty_t("service"), status)
+        self.queue_publish(self.mqtt_helper.avty_t("service"), status)
 
     async def publish_service_state(self: Blink2Mqtt) -> None:
         service = {
@@ -144,10 +154,9 @@ class PublishMixin:
         }
 
         for key, value in service.items():
-            await asyncio.to_thread(
-                self.mqtt_helper.safe_publish,
+            self.queue_publish(
                 self.mqtt_helper.stat_t("service", "service", key),
-                json.dumps(value) if isinstance(value, dict) else str(value),
+                orjson.dumps(value) if isinstance(value, dict) else str(value),
             )
 
     # Devices -------------------------------------------------------------------------------------
@@ -156,16 +165,25 @@ class PublishMixin:
         if self.is_discovered(device_id):
             return
 
+        # flushed straight away, along with anything queued before it, so the device is only marked
+        # discovered once Home Assistant has its config; the availability and state that follow batch together
         topic = self.mqtt_helper.disc_t("device", device_id)
-        component = self.get_component(device_id)
-        await asyncio.to_thread(self.mqtt_helper.safe_publish, topic, json.dumps(component))
-        self.upsert_state(device_id, internal={"discovered": True})
+        # serialized once per component version; rediscovery after a Home Assistant restart reuses the bytes
+        payload = self.discovery_payloads.get(device_id)
+        if payload is None:
+            component = self.get_component(device_id)
+            if self.compact_discovery:
+                component = _compact_discovery(component)
+            payload = self.discovery_payloads[device_id] = orjson.dumps(component)
+        self.queue_publish(topic, payload)
+        if await self.flush_publish_buffer():
+            self.upsert_state(device_id, internal={"discovered": True})
 
     async def publish_device_availability(self: Blink2Mqtt, device_id: str, online: bool = True) -> None:
         payload = "online" if online else "offline"
 
         avty_t = self.get_device_availability_topic(device_id)
-        await asyncio.to_thread(self.mqtt_helper.safe_publish, avty_t, payload)
+        self.queue_publish(avty_t, payload)
 
     async def publish_device_state(self: Blink2Mqtt, device_id: str, subject: str = "", sub: str = "", publish_all: bool = False) -> None:
         if not self.is_discovered(device_id):
@@ -193,20 +211,20 @@ class PublishMixin:
                 else:
                     items[section] = all_state[section]
 
-        for state, value in list(items.items()):
+        for state, value in items.items():
             if subject and state != subject:
                 continue
             if isinstance(value, dict):
                 for k, v in value.items():
                     if sub and k != sub:
                         continue
-                    topic = self.mqtt_helper.stat_t(device_id, state, k)
+                    topic = self.get_state_topic(device_id, state, k)
                     if isinstance(v, list):
-                        v = json.dumps(v)
-                    await asyncio.to_thread(self.mqtt_helper.safe_publish, topic, v)
+                        v = orjson.dumps(v)
+                    self.queue_publish(topic, v)
             else:
-                topic = self.mqtt_helper.stat_t(device_id, state)
-                await asyncio.to_thread(self.mqtt_helper.safe_publish, topic, value)
+                topic = self.get_state_topic(device_id, state)
+                self.queue_publish(topic, value)
 
         # clear dirty keys for this device after publishing
         self.dirty.pop(device_id, None)
@@ -216,4 +234,38 @@ class PublishMixin:
         if payload and isinstance(payload, str):
             self.logger.info(f"updating '{self.get_device_name(device_id)}' with latest snapshot")
             topic = self.mqtt_helper.stat_t(device_id, type)
-            await asyncio.to_thread(self.mqtt_helper.safe_publish, topic, payload)
+            self.queue_publish(topic, payload)
+
+    # Buffered publishes --------------------------------------------------------------------------
+
+    def queue_publish(self: Blink2Mqtt, topic: str, payload: Any) -> None:
+        self.publish_buffer.append((topic, payload))
+        self.publish_pending.set()
+
+    async def flush_publish_buffer(self: Blink2Mqtt) -> bool:
+        batch = self.publish_buffer.copy()
+        self.publish_buffer.clear()
+        if not batch:
+            return True
+        return await asyncio.get_running_loop().run_in_executor(self.mqtt_executor, self._publish_batch, batch)
+
+    def _publish_batch(self: Blink2Mqtt, batch: list[tuple[str, Any]]) -> bool:
+        sent_all = True
+        for topic, payload in batch:
+            # one bad publish shouldn't take the rest of the batch (or the flush loop) down with it
+            try:
+                self.mqtt_helper.safe_publish(topic, payload)
+            except Exception:
+                self.logger.exception(f"failed to publish to {topic}")
+                sent_all = False
+        return sent_all
+
+
+def _compact_discovery(component: dict[str, Any]) -> dict[str, Any]:
+    # shallow copies only; the stored component keeps its long keys for upsert_device merges
+    compact = dict(component)
+    if "origin" in compact:
+        compact["origin"] = {k: v for k, v in compact["origin"].items() if k != "support_url"}
+    if "cmps" in compact:
+        compact["cmps"] = {name: {_COMPACT_KEYS.get(k, k): v for k, v in cmp.items()} for name, cmp in compact["cmps"].items()}
+    return compact
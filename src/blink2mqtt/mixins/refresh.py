@@ -16,8 +16,7 @@ class RefreshMixin:
         await self.blink_refresh()
 
         # get the latests device states from Blink
-        blink_devices = await self.get_cameras()
-        sync_modules = await self.get_sync_modules()
+        blink_devices, sync_modules = await asyncio.gather(self.get_cameras(), self.get_sync_modules())
 
         async def handle_camera(device_id: str, cfg: dict[str, Any]) -> None:
             await self.build_camera_states(device_id, cfg)
@@ -43,16 +42,11 @@ class RefreshMixin:
 
         self.logger.info(f"requesting snapshots from {len(active_device_ids)} camera(s)")
 
-        tasks1 = []
-        tasks2 = []
-        for device_id in active_device_ids:
-            tasks1.append(asyncio.create_task(self.take_snapshot_from_device(device_id)))
-            tasks2.append(asyncio.create_task(self.refresh_snapshot(device_id, "snapshot")))
-
-        await asyncio.gather(*tasks1)
+        await asyncio.gather(*map(self.take_snapshot_from_device, active_device_ids))
         await asyncio.sleep(3)  # Blink says to give them 2-5 seconds
         await self.blink_refresh()
-        await asyncio.gather(*tasks2)
+        # read the cache only after the refresh above has pulled in the new thumbnails
+        await asyncio.gather(*(self.refresh_snapshot(device_id, "snapshot") for device_id in active_device_ids))
 
         if update_last_snapshot:
             now = self.loop.time()
@@ -64,7 +58,7 @@ class RefreshMixin:
         image = await self.get_snapshot_from_device(device_id)
 
         # only store and send to MQTT if we got an image AND the image has changed
-        if image and (type not in states or states[type] is None or states[type] != image):
+        if image and states.get(type) != image:
             states[type] = image
             self.upsert_state(device_id, sensor={"last_event": "Timed snapshot", "last_event_time": datetime.now(timezone.utc).isoformat()})
             await asyncio.gather(self.publish_device_state(device_id), self.publish_device_image(device_id, type))
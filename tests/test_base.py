@@ -1,7 +1,7 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2025 Jeff Culverhouse
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import MagicMock, AsyncMock
 
 from blink2mqtt.base import Base
 
@@ -25,6 +25,26 @@ class TestContextManager:
         obj.mqttc_create.assert_called_once()
         assert obj.running is True
 
+    @pytest.mark.asyncio
+    async def test_aenter_calls_sync_enter_later_in_mro(self):
+        calls = []
+
+        class SyncEnter:
+            def __enter__(self):
+                calls.append("enter")
+
+        class WithSyncEnter(Base, SyncEnter):
+            pass
+
+        assert FakeBase._super_has_enter is False
+        assert WithSyncEnter._super_has_enter is True
+
+        obj = object.__new__(WithSyncEnter)
+        obj.mqttc_create = AsyncMock()
+        await Base.__aenter__(obj)
+
+        assert calls == ["enter"]
+
     @pytest.mark.asyncio
     async def test_aexit_closes_session_and_disconnects(self):
         obj = object.__new__(FakeBase)
@@ -33,22 +53,20 @@ class TestContextManager:
         obj.session = MagicMock()
         obj.session.closed = False
         obj.session.close = AsyncMock()
+        obj.flush_publish_buffer = AsyncMock()
         obj.publish_service_availability = AsyncMock()
         obj.mqttc = MagicMock()
         obj.mqttc.is_connected.return_value = True
         obj.mqttc.loop_stop = MagicMock()
         obj.mqttc.disconnect = MagicMock()
+        obj.blink_executor = MagicMock()
+        obj.mqtt_executor = MagicMock()
 
-        # Mock the running loop
-        with patch("blink2mqtt.base.asyncio.get_running_loop") as mock_loop:
-            loop = MagicMock()
-            loop.is_running.return_value = True
-            loop.create_task = MagicMock()
-            mock_loop.return_value = loop
-
-            await Base.__aexit__(obj, None, None, None)
+        await Base.__aexit__(obj, None, None, None)
 
         assert obj.running is False
+        obj.session.close.assert_awaited_once()
+        obj.flush_publish_buffer.assert_awaited_once()
         obj.publish_service_availability.assert_called_once_with("offline")
         obj.mqttc.disconnect.assert_called_once()
 
@@ -58,11 +76,16 @@ class TestContextManager:
         obj.logger = MagicMock()
         obj.running = True
         obj.session = None
+        obj.flush_publish_buffer = AsyncMock()
         obj.publish_service_availability = AsyncMock()
         obj.mqttc = MagicMock()
         obj.mqttc.is_connected.return_value = False
         obj.mqttc.loop_stop = MagicMock()
+        obj.blink_executor = MagicMock()
+        obj.mqtt_executor = MagicMock()
 
         await Base.__aexit__(obj, None, None, None)
 
         assert obj.running is False
+        obj.blink_executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        obj.mqtt_executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
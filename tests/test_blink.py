@@ -1,17 +1,21 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2025 Jeff Culverhouse
-from unittest.mock import MagicMock
+import pytest
+from unittest.mock import AsyncMock, MagicMock
 
 from blink2mqtt.mixins.blink import BlinkMixin
+from blink2mqtt.mixins.helpers import HelpersMixin
 
 
-class FakeBlinkDevice(BlinkMixin):
+class FakeBlinkDevice(HelpersMixin, BlinkMixin):
     def __init__(self):
         self.logger = MagicMock()
         self.mqtt_helper = MagicMock()
         self.mqtt_helper.service_slug = "blink2mqtt"
         self.devices = {}
         self.states = {}
+        self.state_topics = {}
+        self.component_signatures = {}
 
 
 class TestClassifyDevice:
@@ -56,3 +60,100 @@ class TestClassifyDevice:
 
         assert result is None
         blink.logger.warning.assert_called_once()
+
+
+class TestRefreshDeviceList:
+    @pytest.mark.asyncio
+    async def test_failed_device_does_not_abort_batch(self):
+        blink = FakeBlinkDevice()
+        blink.discovery_complete = True
+        blink.device_list_interval = 3600
+        blink.devices = {"CAM1": {}, "CAM2": {}}
+        blink.get_cameras = AsyncMock(
+            return_value={
+                "CAM1": {"serial_number": "CAM1", "device_name": "Broken"},
+                "CAM2": {"serial_number": "CAM2", "device_name": "Working"},
+            }
+        )
+        blink.get_sync_modules = AsyncMock(return_value={})
+        blink.publish_service_state = AsyncMock()
+        blink.publish_device_availability = AsyncMock()
+        blink.build_component = AsyncMock(side_effect=[RuntimeError("boom"), "CAM2"])
+
+        await blink.refresh_device_list()
+
+        assert blink.build_component.await_count == 2
+        blink.logger.exception.assert_called_once()
+        blink.publish_device_availability.assert_not_called()
+        assert blink.discovery_complete is True
+
+    @pytest.mark.asyncio
+    async def test_failed_list_falls_back_to_last_known(self):
+        blink = FakeBlinkDevice()
+        blink.discovery_complete = True
+        blink.device_list_interval = 3600
+        blink.devices = {"CAM1": {}, "SYNC1": {}}
+        blink.blink_cameras = {"CAM1": {"serial_number": "CAM1", "device_name": "Front"}}
+        blink.blink_sync_modules = {}
+        blink.get_cameras = AsyncMock(side_effect=RuntimeError("timeout"))
+        blink.get_sync_modules = AsyncMock(return_value={"SYNC1": {"serial_number": "SYNC1", "device_name": "Hub"}})
+        blink.publish_service_state = AsyncMock()
+        blink.publish_device_availability = AsyncMock()
+        blink.build_component = AsyncMock(side_effect=lambda device: device["serial_number"])
+
+        await blink.refresh_device_list()
+
+        assert sorted(c.args[0]["serial_number"] for c in blink.build_component.await_args_list) == ["CAM1", "SYNC1"]
+        blink.logger.error.assert_called_once()
+        blink.publish_device_availability.assert_not_called()
+
+
+class TestBuildCameraComponents:
+    def test_builds_topics_from_table(self):
+        blink = FakeBlinkDevice()
+        blink.mqtt_helper.dev_unique_id = MagicMock(side_effect=lambda d, e: f"blink2mqtt_{d}_{e}")
+        blink.mqtt_helper.stat_t = MagicMock(side_effect=lambda *args: "/".join(["blink2mqtt"] + list(args)))
+        blink.mqtt_helper.cmd_t = MagicMock(side_effect=lambda *args: "/".join(["blink2mqtt"] + list(args) + ["set"]))
+
+        cmps = blink.build_camera_components("CAM1", {"supports_get_config": False})
+
+        assert cmps["snapshot"]["topic"] == "blink2mqtt/CAM1/snapshot"
+        assert "stat_t" not in cmps["snapshot"]
+        assert cmps["motion_detection"]["stat_t"] == "blink2mqtt/CAM1/switch/motion_detection"
+        assert cmps["motion_detection"]["cmd_t"] == "blink2mqtt/CAM1/switch/motion_detection/set"
+        assert "cmd_t" not in cmps["temperature"]
+        assert cmps["nightvision"]["options"] == ["auto", "on", "off"]
+        assert cmps["nightvision"]["enabled_by_default"] is False
+        assert cmps["last_event_time"]["uniq_id"] == "blink2mqtt_CAM1_last_event_time"
+
+
+class TestResolveCameraViaDevice:
+    def test_matches_sync_module_by_network_id(self):
+        blink = FakeBlinkDevice()
+        blink.mqtt_helper.device_slug = MagicMock(side_effect=lambda d: f"blink2mqtt_{d}")
+        blink.blink_sync_modules = {
+            "SYNC1": {"serial_number": "SYNC1", "device_name": "Hub", "sync_id": 11, "network_id": 2001},
+        }
+        blink.index_sync_modules()
+
+        assert blink.resolve_camera_via_device({"sync_module": {"network_id": "2001"}}) == "blink2mqtt_SYNC1"
+        assert blink.resolve_camera_via_device({"sync_module": "Hub"}) == "blink2mqtt_SYNC1"
+        assert blink.resolve_camera_via_device({"sync_module": "Other"}) is None
+        blink.mqtt_helper.device_slug.assert_called_once_with("SYNC1")
+
+
+class TestComponentChanged:
+    def test_unchanged_signature_skips_rebuild(self):
+        blink = FakeBlinkDevice()
+
+        assert blink.component_changed("CAM1", ("Front", "Amazon", "owl", "1.0")) is True
+        assert blink.component_changed("CAM1", ("Front", "Amazon", "owl", "1.0")) is False
+
+    def test_changed_signature_requests_rediscovery(self):
+        blink = FakeBlinkDevice()
+        blink.dirty = {}
+        blink.states = {"CAM1": {"internal": {"discovered": True}}}
+        blink.component_changed("CAM1", ("Front", "Amazon", "owl", "1.0"))
+
+        assert blink.component_changed("CAM1", ("Front", "Amazon", "owl", "1.1")) is True
+        assert blink.is_discovered("CAM1") is False
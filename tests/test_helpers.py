@@ -2,7 +2,7 @@
 # Copyright (c) 2025 Jeff Culverhouse
 import os
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from mqtt_helper import ConfigError
 from blink2mqtt.mixins.helpers import HelpersMixin
@@ -11,8 +11,12 @@ from blink2mqtt.mixins.helpers import HelpersMixin
 class FakeHelpers(HelpersMixin):
     def __init__(self):
         self.logger = MagicMock()
+        self.loop = MagicMock()
         self.running = True
         self.dirty = {}
+        self.tasks = []
+        self.device_names = {}
+        self.discovery_payloads = {}
 
 
 class TestLoadConfigFromFile:
@@ -173,6 +177,16 @@ class TestHandleSignal:
         assert helpers.running is False
         helpers.logger.warning.assert_called_once()
 
+    def test_cancels_tracked_tasks(self):
+        helpers = FakeHelpers()
+        task = MagicMock()
+        helpers.tasks = [task]
+
+        with patch("blink2mqtt.mixins.helpers.threading.Timer"):
+            helpers.handle_signal(15, None)  # SIGTERM = 15
+
+        helpers.loop.call_soon_threadsafe.assert_called_once_with(task.cancel)
+
 
 class TestUpsertDevice:
     def test_upsert_device_creates_new_entry(self):
@@ -194,6 +208,24 @@ class TestUpsertDevice:
         changed = helpers.upsert_device("DEV001", component={"platform": "switch", "name": "Test"})
         assert changed is False
 
+    def test_upsert_device_caches_device_name(self):
+        helpers = FakeHelpers()
+        helpers.devices = {}
+        helpers.states = {}
+
+        helpers.upsert_device("DEV001", component={"device": {"name": "Front Door"}})
+        assert helpers.device_names["DEV001"] == "Front Door"
+        assert helpers.get_device_name("DEV001") == "Front Door"
+
+    def test_upsert_device_drops_cached_discovery_payload(self):
+        helpers = FakeHelpers()
+        helpers.devices = {}
+        helpers.states = {}
+        helpers.discovery_payloads = {"DEV001": b"{}"}
+
+        helpers.upsert_device("DEV001", component={"device": {"name": "Renamed"}})
+        assert "DEV001" not in helpers.discovery_payloads
+
     def test_upsert_state_merges_nested_dicts(self):
         helpers = FakeHelpers()
         helpers.devices = {}
@@ -205,6 +237,45 @@ class TestUpsertDevice:
         assert helpers.states["DEV001"]["sensor"]["temperature"] == 72
         assert helpers.states["DEV001"]["sensor"]["battery"] == "OK"
 
+    def test_upsert_state_only_dirties_changed_keys(self):
+        helpers = FakeHelpers()
+        helpers.devices = {}
+        helpers.states = {}
+
+        helpers.upsert_state("DEV001", sensor={"temperature": 72, "battery": "OK"})
+        helpers.dirty.clear()
+        helpers.upsert_state("DEV001", sensor={"temperature": 72, "battery": "Low"})
+
+        assert helpers.dirty["DEV001"] == {("sensor", "battery")}
+
+    def test_upsert_state_only_dirties_lists_with_new_items(self):
+        helpers = FakeHelpers()
+        helpers.devices = {}
+        helpers.states = {}
+
+        helpers.upsert_state("DEV001", sensor={"clips": ["a", "b"]}, tags=["x"])
+        helpers.upsert_state("DEV001", sensor={"clips": ["b", "c"]}, tags=["y"])
+        helpers.dirty.clear()
+        helpers.upsert_state("DEV001", sensor={"clips": ["b", "c"]}, tags=["y"])
+
+        assert helpers.dirty["DEV001"] == set()
+
+        helpers.upsert_state("DEV001", sensor={"clips": ["d"]}, tags=["x"])
+
+        assert helpers.dirty["DEV001"] == {("sensor", "clips")}
+
+
+class TestGetStateTopic:
+    def test_builds_topic_once(self):
+        helpers = FakeHelpers()
+        helpers.state_topics = {}
+        helpers.mqtt_helper = MagicMock()
+        helpers.mqtt_helper.stat_t = MagicMock(side_effect=lambda *args: "/".join(["blink2mqtt"] + list(args)))
+
+        assert helpers.get_state_topic("DEV001", "sensor", "temperature") == "blink2mqtt/DEV001/sensor/temperature"
+        assert helpers.get_state_topic("DEV001", "sensor", "temperature") == "blink2mqtt/DEV001/sensor/temperature"
+        helpers.mqtt_helper.stat_t.assert_called_once_with("DEV001", "sensor", "temperature")
+
 
 class TestSnapshotIntervalConfig:
     def test_legacy_snapshot_interval_falls_back_to_wired_minutes(self, tmp_path, monkeypatch):
@@ -19,6 +19,9 @@ class FakeLooper(HelpersMixin, LoopsMixin):
         self.snapshot_interval_battery_hours = 1
         self.blink_cameras = {}
         self.states = {}
+        self.events_ready = asyncio.Event()
+        self.publish_pending = asyncio.Event()
+        self.publish_buffer = []
 
     async def refresh_all_devices(self):
         pass
@@ -118,6 +121,27 @@ class TestHeartbeat:
         looper.logger.debug.assert_called()
 
 
+class TestProcessEventsLoop:
+    @pytest.mark.asyncio
+    async def test_waits_for_events_ready_then_processes(self):
+        looper = FakeLooper()
+
+        async def mock_process_events():
+            looper.running = False
+
+        looper.process_events = AsyncMock(side_effect=mock_process_events)
+        task = asyncio.create_task(looper.process_events_loop())
+        await asyncio.sleep(0)
+
+        looper.process_events.assert_not_called()
+
+        looper.events_ready.set()
+        await asyncio.wait_for(task, timeout=1)
+
+        looper.process_events.assert_called_once()
+        assert not looper.events_ready.is_set()
+
+
 class TestSnapshotLoop:
     @pytest.mark.asyncio
     async def test_collects_only_due_wired_devices(self):
@@ -186,7 +210,7 @@ class TestMainLoop:
         assert call_order == ["connect", "refresh_device_list", "refresh_snapshot"]
 
     @pytest.mark.asyncio
-    async def test_creates_4_tasks(self):
+    async def test_creates_loop_tasks(self):
         looper = FakeLooper()
         looper.connect = AsyncMock()
         looper.refresh_device_list = AsyncMock()
@@ -207,8 +231,9 @@ class TestMainLoop:
         ):
             await looper.main_loop()
 
-        assert len(created_tasks) == 4
+        assert len(created_tasks) == 6
         assert "device_list_loop" in created_tasks
         assert "device_loop" in created_tasks
         assert "collect_snapshots_loop" in created_tasks
         assert "heartbeat" in created_tasks
+        assert "publish_flush_loop" in created_tasks
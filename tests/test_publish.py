@@ -1,8 +1,10 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2025 Jeff Culverhouse
+import asyncio
 import json
+from datetime import date
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from blink2mqtt.mixins.publish import PublishMixin
 from blink2mqtt.mixins.helpers import HelpersMixin
@@ -13,6 +15,7 @@ class FakePublisher(HelpersMixin, PublishMixin):
         self.service = "blink2mqtt"
         self.service_name = "blink2mqtt service"
         self.qos = 0
+        self.compact_discovery = False
         self.config = {"version": "v0.1.0-test"}
         self.snapshot_interval_wired_minutes = 5
         self.snapshot_interval_battery_hours = 0
@@ -29,10 +32,16 @@ class FakePublisher(HelpersMixin, PublishMixin):
         self.mqtt_helper.cmd_t = MagicMock(side_effect=lambda *args: "/".join(["blink2mqtt"] + list(args) + ["set"]))
         self.mqtt_helper.disc_t = MagicMock(side_effect=lambda kind, did: f"homeassistant/{kind}/blink2mqtt_{did}/config")
         self.devices = {}
+        self.device_names = {}
+        self.discovery_payloads = {}
+        self.state_topics = {}
         self.states = {}
+        self.publish_buffer = []
+        self.mqtt_executor = None
+        self.publish_pending = asyncio.Event()
 
 
-async def _fake_to_thread(fn, *args):
+async def _fake_run_in_executor(executor, fn, *args):
     return fn(*args)
 
 
@@ -42,7 +51,7 @@ class TestServiceDiscovery:
         pub = FakePublisher()
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_service_discovery()
 
         pub.mqtt_helper.safe_publish.assert_called()
@@ -58,11 +67,22 @@ class TestServiceDiscovery:
         pub = FakePublisher()
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_service_discovery()
 
         assert pub.states["service"]["internal"]["discovered"] is True
 
+    @pytest.mark.asyncio
+    async def test_service_not_marked_discovered_when_publish_fails(self):
+        pub = FakePublisher()
+        pub.mqtt_helper.safe_publish.side_effect = RuntimeError("broker gone")
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.publish_service_discovery()
+
+        assert "service" not in pub.states
+
 
 class TestServiceAvailability:
     @pytest.mark.asyncio
@@ -70,8 +90,9 @@ class TestServiceAvailability:
         pub = FakePublisher()
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_service_availability("online")
+            await pub.flush_publish_buffer()
 
         assert pub.mqtt_helper.safe_publish.call_args.args[1] == "online"
 
@@ -80,8 +101,9 @@ class TestServiceAvailability:
         pub = FakePublisher()
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_service_availability("offline")
+            await pub.flush_publish_buffer()
 
         assert pub.mqtt_helper.safe_publish.call_args.args[1] == "offline"
 
@@ -91,7 +113,7 @@ class TestServiceState:
     async def test_publishes_all_metrics(self):
         pub = FakePublisher()
         pub.api_calls = 42
-        pub.last_call_date = "2026-01-15T10:30:00"
+        pub.last_call_date = date(2026, 1, 15)
         pub.rate_limited = False
         pub.device_interval = 30
         pub.device_list_interval = 3600
@@ -99,8 +121,9 @@ class TestServiceState:
         pub.snapshot_interval_battery_hours = 2
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_service_state()
+            await pub.flush_publish_buffer()
 
         topics = [c.args[0] for c in pub.mqtt_helper.safe_publish.call_args_list]
         assert any("server" in t for t in topics)
@@ -113,7 +136,7 @@ class TestServiceState:
     async def test_last_api_call_published(self):
         pub = FakePublisher()
         pub.api_calls = 0
-        pub.last_call_date = "2026-01-15T10:30:00"
+        pub.last_call_date = date(2026, 1, 15)
         pub.rate_limited = False
         pub.device_interval = 30
         pub.device_list_interval = 3600
@@ -121,8 +144,9 @@ class TestServiceState:
         pub.snapshot_interval_battery_hours = 2
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_service_state()
+            await pub.flush_publish_buffer()
 
         for c in pub.mqtt_helper.safe_publish.call_args_list:
             if "last_api_call" in c.args[0]:
@@ -145,12 +169,27 @@ class TestDeviceDiscovery:
         pub.states["BLINK001"] = {}
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_discovery("BLINK001")
+            await pub.flush_publish_buffer()
 
         pub.mqtt_helper.safe_publish.assert_called_once()
         topic = pub.mqtt_helper.safe_publish.call_args.args[0]
         assert topic == "homeassistant/device/blink2mqtt_BLINK001/config"
+        assert pub.is_discovered("BLINK001")
+
+    @pytest.mark.asyncio
+    async def test_not_marked_discovered_when_publish_fails(self):
+        pub = FakePublisher()
+        pub.devices["BLINK001"] = {"component": {"device": {"name": "Front Door"}}}
+        pub.states["BLINK001"] = {}
+        pub.mqtt_helper.safe_publish.side_effect = RuntimeError("broker gone")
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.publish_device_discovery("BLINK001")
+
+        assert not pub.is_discovered("BLINK001")
 
     @pytest.mark.asyncio
     async def test_skips_if_already_discovered(self):
@@ -159,8 +198,9 @@ class TestDeviceDiscovery:
         pub.states["BLINK001"] = {"internal": {"discovered": True}}
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_discovery("BLINK001")
+            await pub.flush_publish_buffer()
 
         pub.mqtt_helper.safe_publish.assert_not_called()
 
@@ -173,8 +213,9 @@ class TestDeviceAvailability:
         pub.states["BLINK001"] = {}
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_availability("BLINK001", online=True)
+            await pub.flush_publish_buffer()
 
         assert pub.mqtt_helper.safe_publish.call_args.args[1] == "online"
 
@@ -185,8 +226,9 @@ class TestDeviceAvailability:
         pub.states["BLINK001"] = {}
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_availability("BLINK001", online=False)
+            await pub.flush_publish_buffer()
 
         assert pub.mqtt_helper.safe_publish.call_args.args[1] == "offline"
 
@@ -199,8 +241,9 @@ class TestDeviceState:
         pub.states["BLINK001"] = {"sensor": {"battery_status": "OK"}}
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_state("BLINK001")
+            await pub.flush_publish_buffer()
 
         # Not discovered yet, so should not publish
         pub.mqtt_helper.safe_publish.assert_not_called()
@@ -215,8 +258,9 @@ class TestDeviceState:
         }
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_state("BLINK001", publish_all=True)
+            await pub.flush_publish_buffer()
 
         topics = [c.args[0] for c in pub.mqtt_helper.safe_publish.call_args_list]
         assert any("battery_status" in t for t in topics)
@@ -231,12 +275,13 @@ class TestDeviceState:
         }
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_state("BLINK001", publish_all=True)
+            await pub.flush_publish_buffer()
 
         for c in pub.mqtt_helper.safe_publish.call_args_list:
             if "items" in c.args[0]:
-                assert c.args[1] == json.dumps([1, 2, 3])
+                assert json.loads(c.args[1]) == [1, 2, 3]
 
 
 class TestDeviceImage:
@@ -247,8 +292,9 @@ class TestDeviceImage:
         pub.states["BLINK001"] = {"snapshot": "base64encodedimage=="}
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_image("BLINK001", "snapshot")
+            await pub.flush_publish_buffer()
 
         pub.mqtt_helper.safe_publish.assert_called_once()
         assert pub.mqtt_helper.safe_publish.call_args.args[1] == "base64encodedimage=="
@@ -260,7 +306,127 @@ class TestDeviceImage:
         pub.states["BLINK001"] = {"snapshot": None}
 
         with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
-            mock_asyncio.to_thread = _fake_to_thread
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
             await pub.publish_device_image("BLINK001", "snapshot")
+            await pub.flush_publish_buffer()
+
+        pub.mqtt_helper.safe_publish.assert_not_called()
+
+
+class TestPublishBuffer:
+    @pytest.mark.asyncio
+    async def test_queue_publish_defers_until_flush(self):
+        pub = FakePublisher()
+
+        pub.queue_publish("blink2mqtt/BLINK001/sensor/temperature", 70)
 
         pub.mqtt_helper.safe_publish.assert_not_called()
+        assert pub.publish_pending.is_set()
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.flush_publish_buffer()
+
+        pub.mqtt_helper.safe_publish.assert_called_once_with("blink2mqtt/BLINK001/sensor/temperature", 70)
+        assert pub.publish_buffer == []
+
+    @pytest.mark.asyncio
+    async def test_flush_preserves_order(self):
+        pub = FakePublisher()
+        pub.queue_publish("topic/a", "1")
+        pub.queue_publish("topic/b", "2")
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.flush_publish_buffer()
+
+        topics = [c.args[0] for c in pub.mqtt_helper.safe_publish.call_args_list]
+        assert topics == ["topic/a", "topic/b"]
+
+    @pytest.mark.asyncio
+    async def test_failed_publish_does_not_stop_the_batch(self):
+        pub = FakePublisher()
+        pub.mqtt_helper.safe_publish.side_effect = [RuntimeError("broker gone"), None]
+        pub.queue_publish("topic/a", "1")
+        pub.queue_publish("topic/b", "2")
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.flush_publish_buffer()
+
+        topics = [c.args[0] for c in pub.mqtt_helper.safe_publish.call_args_list]
+        assert topics == ["topic/a", "topic/b"]
+        pub.logger.exception.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_device_discovery_flushes_earlier_publishes_first(self):
+        pub = FakePublisher()
+        pub.devices["BLINK001"] = {"component": {"avty_t": "blink2mqtt/BLINK001/availability", "device": {"name": "Front Door"}}}
+        pub.states["BLINK001"] = {}
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.publish_service_availability("online")
+            await pub.publish_device_discovery("BLINK001")
+            await pub.publish_device_availability("BLINK001", online=True)
+            pub.mqtt_helper.safe_publish.assert_called()
+            assert pub.publish_buffer == [("blink2mqtt/BLINK001/availability", "online")]
+            await pub.flush_publish_buffer()
+
+        topics = [c.args[0] for c in pub.mqtt_helper.safe_publish.call_args_list]
+        assert topics == ["blink2mqtt/service/availability", "homeassistant/device/blink2mqtt_BLINK001/config", "blink2mqtt/BLINK001/availability"]
+
+    @pytest.mark.asyncio
+    async def test_rediscovery_reuses_serialized_payload(self):
+        pub = FakePublisher()
+        pub.devices["BLINK001"] = {"component": {"device": {"name": "Front Door"}}}
+        pub.states["BLINK001"] = {}
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.publish_device_discovery("BLINK001")
+            cached = pub.discovery_payloads["BLINK001"]
+            pub.states["BLINK001"]["internal"]["discovered"] = False
+            await pub.publish_device_discovery("BLINK001")
+
+        payloads = [c.args[1] for c in pub.mqtt_helper.safe_publish.call_args_list]
+        assert payloads[0] is cached
+        assert payloads[1] is cached
+
+    @pytest.mark.asyncio
+    async def test_compact_discovery_shortens_payload(self):
+        pub = FakePublisher()
+        pub.compact_discovery = True
+        pub.devices["BLINK001"] = {
+            "component": {
+                "device": {"name": "Front Door"},
+                "origin": {"name": "blink2mqtt service", "support_url": "https://github.com/weirdTangent/blink2mqtt"},
+                "cmps": {"battery": {"platform": "sensor", "device_class": "battery", "unit_of_measurement": "%", "entity_category": "diagnostic"}},
+            }
+        }
+        pub.states["BLINK001"] = {}
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.publish_device_discovery("BLINK001")
+
+        payload = json.loads(pub.mqtt_helper.safe_publish.call_args.args[1])
+        assert payload["origin"] == {"name": "blink2mqtt service"}
+        assert payload["cmps"]["battery"] == {"platform": "sensor", "dev_cla": "battery", "unit_of_meas": "%", "ent_cat": "diagnostic"}
+        assert "support_url" in pub.devices["BLINK001"]["component"]["origin"]
+
+    @pytest.mark.asyncio
+    async def test_rediscover_all_resends_discovered_devices(self):
+        pub = FakePublisher()
+        pub.publish_service_state = AsyncMock()
+        pub.publish_service_discovery = AsyncMock()
+        pub.devices["BLINK001"] = {"component": {"device": {"name": "Front Door"}}}
+        pub.states["BLINK001"] = {"internal": {"discovered": True}}
+
+        with patch("blink2mqtt.mixins.publish.asyncio") as mock_asyncio:
+            mock_asyncio.get_running_loop.return_value.run_in_executor = _fake_run_in_executor
+            await pub.rediscover_all()
+
+        topics = [c.args[0] for c in pub.mqtt_helper.safe_publish.call_args_list]
+        assert topics[0] == "homeassistant/device/blink2mqtt_BLINK001/config"
+        assert pub.is_discovered("BLINK001")
@@ -16,6 +16,7 @@ class FakeRefresher(HelpersMixin, RefreshMixin):
         self.snapshot_interval_wired_minutes = 5
         self.snapshot_interval_battery_hours = 0
         self.devices = {}
+        self.device_names = {}
         self.states = {}
         self.dirty = {}
         self.blink_cameras = {}
@@ -168,6 +169,21 @@ class TestRefreshSnapshotAllDevices:
         assert "last_snapshot" in r.states["WIRED_CAMERA"]["internal"]
         assert "last_snapshot" in r.states["BATTERY_CAMERA"]["internal"]
 
+    @pytest.mark.asyncio
+    async def test_snapshot_read_after_blink_refresh(self):
+        r = FakeRefresher()
+        r.blink_cameras = {"WIRED_CAMERA": {}}
+        r.states = {"WIRED_CAMERA": {}}
+        calls = []
+        r.take_snapshot_from_device = AsyncMock(side_effect=lambda device_id: calls.append("snap"))
+        r.blink_refresh = AsyncMock(side_effect=lambda: calls.append("refresh"))
+        r.get_snapshot_from_device = AsyncMock(side_effect=lambda device_id: calls.append("read"))
+
+        with patch("blink2mqtt.mixins.refresh.asyncio.sleep", new=AsyncMock()):
+            await r.refresh_snapshot_devices(["WIRED_CAMERA"])
+
+        assert calls == ["snap", "refresh", "read"]
+
     @pytest.mark.asyncio
     async def test_refresh_snapshot_devices_limits_to_requested_ids(self):
         r = FakeRefresher()